@@ -9,9 +9,9 @@
 
 
 from __future__ import annotations
-import hashlib
 import re
-from pathlib import Path
+import zlib
+from itertools import repeat
 from typing import Dict, List, Set
 
 
@@ -22,10 +22,21 @@ WINDOWS_RESERVED = {
     *{f'LPT{i}' for i in range(1, 10)}
 }
 
-FORBIDDEN_CHARS_PATTERN = re.compile(r'[<>:"/\\|?*\[\]\^#%]|[\x00-\x1f]')
-CURLY_APOSTROPHE_PATTERN = re.compile(r'[\u2018\u2019]')
 REPLACEMENT_CHAR = '_'
 
+# Forbidden characters (and control chars) -> REPLACEMENT_CHAR, curly apostrophes -> "'"
+_FORBIDDEN_TRANS = str.maketrans({
+    **{c: REPLACEMENT_CHAR for c in '<>:"/\\|?*[]^#%' + ''.join(chr(i) for i in range(32))},
+    '\u2018': "'", '\u2019': "'",
+})
+
+# Precompiled patterns for the per-filename hot paths
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:['\u2018\u2019][A-Za-z0-9]+)*")
+# ASCII tokenizer: keep alphanumerics, turn everything else into a split point
+_TOKEN_TRANS = str.maketrans({chr(i): ' ' for i in range(128) if not chr(i).isalnum()})
+_SPLIT_RE = re.compile(r'[_\-]+')
+_VOWEL_RE = re.compile(r'[aeiouAEIOU]')
+
 # File size limits
 MAX_TOTAL_PATH = 260
 MAX_COMPONENT = 255
@@ -43,16 +54,26 @@ STOPWORDS = {
 
 NOISE_TOKENS = {'index','default','home','page','http','https','www','html','htm'}
 
+_NONINFORMATIVE = frozenset(STOPWORDS) | frozenset(NOISE_TOKENS)
+
+def _collapse(s: str, ch: str) -> str:
+    """Collapse runs of ch into a single ch (str.replace is cheaper than a regex here)."""
+    double = ch * 2
+    while double in s:
+        s = s.replace(double, ch)
+    return s
+
 def tokenize_name(name: str) -> list[str]:
     """Extract alphanumeric tokens from a name, preserving apostrophes (including curly) within words."""
-    return re.findall(r"[A-Za-z0-9]+(?:['\u2018\u2019][A-Za-z0-9]+)*", name)
+    if name.isascii() and "'" not in name:
+        return name.translate(_TOKEN_TRANS).split()
+    return _TOKEN_RE.findall(name)
 
 def is_informative(tok: str) -> bool:
     """Check if a token is informative (not a stopword or noise token)."""
-    t = tok.lower()
-    if t in STOPWORDS or t in NOISE_TOKENS:
-        return False
-    return True
+    if tok.isascii() and tok.islower():
+        return tok not in _NONINFORMATIVE
+    return tok.lower() not in _NONINFORMATIVE
 
 def abbreviate_token(tok: str, max_len: int = 10) -> str:
     """
@@ -71,13 +92,12 @@ def abbreviate_token(tok: str, max_len: int = 10) -> str:
         return tok
 
     # CamelCase initials
-    if re.search(r'[A-Z].*[A-Z]', tok):
-        caps = ''.join(ch for ch in tok if ch.isupper())
-        if 2 <= len(caps) <= max_len:
-            return caps
+    caps = [ch for ch in tok if 'A' <= ch <= 'Z']
+    if 2 <= len(caps) <= max_len:
+        return ''.join(caps)
 
     # snake/hyphen initials
-    parts = re.split(r'[_\-]+', tok)
+    parts = _SPLIT_RE.split(tok)
     if len(parts) > 1:
         initials = ''.join(p[0] for p in parts if p)
         if 2 <= len(initials) <= max_len:
@@ -85,7 +105,7 @@ def abbreviate_token(tok: str, max_len: int = 10) -> str:
 
     # vowel-drop core
     core = tok[1:-1]
-    core_novowels = re.sub(r'[aeiouAEIOU]', '', core)
+    core_novowels = _VOWEL_RE.sub('', core)
     candidate = (tok[0] + core_novowels + tok[-1])[:max_len]
     if len(candidate) < 3 and len(tok) >= 3:
         candidate = tok[:max_len]
@@ -111,42 +131,58 @@ def shorten_from_right(tokens: list[str], max_length: int, separator: str = ' ')
     Returns:
         Shortened string that fits within max_length
     """
-    # First, check if we even need to shorten
-    current = separator.join(tokens)
-    if len(current) <= max_length:
-        return current
+    # Track the joined length incrementally instead of re-joining after every change
+    sep_len = len(separator)
+    lengths = [len(tok) for tok in tokens]
+    chars = sum(lengths)
+    count = len(tokens)
+
+    def joined_len() -> int:
+        return chars + sep_len * (count - 1) if count else 0
+
+    if joined_len() <= max_length:
+        return separator.join(tokens)
     
-    # Make a working copy
+    # Working copy plus per-token metadata; removed tokens are marked dead rather than popped
     working_tokens = tokens.copy()
+    live = [True] * count
+
+    def result() -> str:
+        return separator.join(tok for tok, alive in zip(working_tokens, live) if alive)
     
     # Strategy 1: Remove stopwords from right to left
-    for i in range(len(working_tokens) - 1, -1, -1):
+    for i in range(count - 1, -1, -1):
         if not is_informative(working_tokens[i]):
-            working_tokens.pop(i)
-            current = separator.join(working_tokens)
-            if len(current) <= max_length:
-                return current
+            live[i] = False
+            chars -= lengths[i]
+            count -= 1
+            if joined_len() <= max_length:
+                return result()
     
     # Strategy 2: Abbreviate long tokens (>10 chars) from right to left
     for i in range(len(working_tokens) - 1, -1, -1):
-        if len(working_tokens[i]) > 10:
-            original = working_tokens[i]
-            abbreviated = abbreviate_token(original)
-            if abbreviated != original and len(abbreviated) < len(original):
+        if live[i] and lengths[i] > 10:
+            abbreviated = abbreviate_token(working_tokens[i])
+            if len(abbreviated) < lengths[i]:
                 working_tokens[i] = abbreviated
-                current = separator.join(working_tokens)
-                if len(current) <= max_length:
-                    return current
+                chars -= lengths[i] - len(abbreviated)
+                lengths[i] = len(abbreviated)
+                if joined_len() <= max_length:
+                    return result()
     
     # Strategy 3: Remove tokens from right to left (keep at least first token)
-    while len(working_tokens) > 1:
-        working_tokens.pop()
-        current = separator.join(working_tokens)
-        if len(current) <= max_length:
-            return current
+    for i in range(len(working_tokens) - 1, -1, -1):
+        if count <= 1:
+            break
+        if live[i]:
+            live[i] = False
+            chars -= lengths[i]
+            count -= 1
+            if joined_len() <= max_length:
+                return result()
     
     # Strategy 4: Last resort - truncate
-    current = separator.join(working_tokens)
+    current = result()
     if len(current) > max_length:
         current = current[:max_length].rstrip(separator + '-_ .')
     
@@ -170,25 +206,25 @@ def sanitize_component(name: str, max_length: int = MAX_COMPONENT, *, allow_spac
         return 'unnamed'
 
     separator = ' ' if allow_spaces else REPLACEMENT_CHAR
-    name = CURLY_APOSTROPHE_PATTERN.sub("'", name)
-    name = FORBIDDEN_CHARS_PATTERN.sub(REPLACEMENT_CHAR, name)
-    name = name.replace(':', REPLACEMENT_CHAR)
+    name = name.translate(_FORBIDDEN_TRANS)
     name = name.rstrip(' .')
-    name = re.sub(f'{re.escape(REPLACEMENT_CHAR)}+', REPLACEMENT_CHAR, name)
+    name = _collapse(name, REPLACEMENT_CHAR)
 
     if allow_spaces:
         name = name.replace(REPLACEMENT_CHAR, separator)
-        name = re.sub(r' +', ' ', name)
+        name = _collapse(name, ' ')
         name = name.strip()
 
-    base = name.split('.')[0].upper()
-    if base in WINDOWS_RESERVED:
+    # Reserved names are all 3 or 4 characters long
+    dot = name.find('.')
+    stem_end = dot if dot != -1 else len(name)
+    if 3 <= stem_end <= 4 and name[:stem_end].upper() in WINDOWS_RESERVED:
         name = separator + name
 
     if len(name) > max_length:
-        if '.' in name:
-            stem = name[:name.rfind('.')]
-            suffix = name[name.rfind('.'):]
+        dot = name.rfind('.')
+        if dot != -1:
+            stem, suffix = name[:dot], name[dot:]
         else:
             stem, suffix = name, ''
         name = stem[:max_length - len(suffix)] + suffix
@@ -196,9 +232,28 @@ def sanitize_component(name: str, max_length: int = MAX_COMPONENT, *, allow_spac
     return name or 'unnamed'
 
 
+def sanitize_title(title: str, extension: str, max_base_len: int = DEFAULT_MAX_BASENAME,
+                   use_spaces: bool = True) -> str:
+    """
+    Turn a title into a sanitized filename, without checking for conflicts.
+    Depends only on its arguments, so it can run in worker processes.
+    """
+    tokens = tokenize_name(title)
+    if not tokens:
+        base = 'unnamed'
+    else:
+        separator = ' ' if use_spaces else '-'
+        # Use the new shorten_from_right function
+        base = shorten_from_right(tokens, max_base_len, separator)
+
+    base = sanitize_component(base, max_length=max_base_len, allow_spaces=use_spaces)
+    return sanitize_component(base + extension, max_length=MAX_COMPONENT, allow_spaces=use_spaces)
+
+
 def get_unique_filename_advanced(title: str, extension: str, existing_files: Set[str], 
                                 max_base_len: int = DEFAULT_MAX_BASENAME, 
-                                use_spaces: bool = True) -> str:
+                                use_spaces: bool = True,
+                                version_counters: Dict[str, int] | None = None) -> str:
     """
     Generate a unique, sanitized filename from a title.
     Only shortens the filename if it exceeds max_base_len.
@@ -210,49 +265,64 @@ def get_unique_filename_advanced(title: str, extension: str, existing_files: Set
         existing_files: Set of existing filenames (lowercase) to avoid conflicts
         max_base_len: Maximum length for the base filename (default: 150)
         use_spaces: Whether to use spaces in the filename (default: True)
+        version_counters: Optional map of lowercase filename -> next "-v" counter to try,
+            updated in place so repeated titles don't re-probe versions already taken
     
     Returns:
         Unique, sanitized filename
     """
-    tokens = tokenize_name(title)
-    if not tokens:
-        base = 'unnamed'
-    else:
-        separator = ' ' if use_spaces else '-'
-        # Use the new shorten_from_right function
-        base = shorten_from_right(tokens, max_base_len, separator)
+    filename = sanitize_title(title, extension, max_base_len, use_spaces)
+    return make_unique_filename(filename, title, existing_files, version_counters)
 
-    base = sanitize_component(base, max_length=max_base_len, allow_spaces=use_spaces)
-    filename = sanitize_component(base + extension, max_length=MAX_COMPONENT, allow_spaces=use_spaces)
 
-    counter = 2
+def make_unique_filename(filename: str, title: str, existing_files: Set[str],
+                         version_counters: Dict[str, int] | None = None) -> str:
+    """
+    Add a "-vN" suffix (or a hash suffix, as a last resort) to an already
+    sanitized filename until it doesn't conflict with existing_files.
+    See get_unique_filename_advanced for the arguments.
+    """
     original_filename = filename
+    counter_key = original_filename.lower()
+    counter = version_counters.get(counter_key, 2) if version_counters is not None else 2
+    attempts = 0
+
+    # Only the version suffix changes between iterations
+    dot = original_filename.rfind('.')
+    if dot != -1:
+        name_part, ext_part = original_filename[:dot], original_filename[dot:]
+    else:
+        name_part, ext_part = original_filename, ''
 
-    while filename.lower() in existing_files:
-        if '.' in original_filename:
-            name_part = original_filename[:original_filename.rfind('.')]
-            ext_part = original_filename[original_filename.rfind('.'):]
-        else:
-            name_part = original_filename
-            ext_part = ''
+    # Truncated bases only depend on the suffix length, so reuse them across counters
+    truncated_cache: Dict[int, str] = {}
+    max_len_no_suffix = MAX_COMPONENT - len(ext_part)
+    name_len = len(name_part)
 
+    while filename.lower() in existing_files:
         version_suffix = f"-v{counter}"
-        new_name = name_part + version_suffix
-
-        max_name_len = MAX_COMPONENT - len(ext_part) - len(version_suffix)
-        if len(new_name) > max_name_len:
-            truncated_base = name_part[:max_name_len].rstrip('-_ .')
-            new_name = truncated_base + version_suffix
 
-        filename = new_name + ext_part
+        max_name_len = max_len_no_suffix - len(version_suffix)
+        if name_len + len(version_suffix) > max_name_len:
+            truncated_base = truncated_cache.get(max_name_len)
+            if truncated_base is None:
+                truncated_base = name_part[:max_name_len].rstrip('-_ .')
+                truncated_cache[max_name_len] = truncated_base
+            filename = truncated_base + version_suffix + ext_part
+        else:
+            filename = name_part + version_suffix + ext_part
         counter += 1
+        attempts += 1
 
-        if counter > 50:
-            hash_suffix = f"-x{hashlib.blake2s(title.encode('utf-8'), digest_size=4).hexdigest()[:6]}"
-            max_name_len = MAX_COMPONENT - len(ext_part) - len(hash_suffix)
+        if attempts > 48:
+            hash_suffix = f"-x{zlib.crc32(title.encode('utf-8')) & 0xFFFFFF:06x}"
+            max_name_len = max_len_no_suffix - len(hash_suffix)
             truncated_base = name_part[:max_name_len].rstrip('-_ .')
             filename = truncated_base + hash_suffix + ext_part
-            break
+            return filename
+
+    if attempts and version_counters is not None:
+        version_counters[counter_key] = counter
 
     return filename
 
@@ -264,6 +334,7 @@ class FilenameManager:
     def __init__(self, use_spaces: bool = True):
         self.use_spaces = use_spaces
         self.existing_files: Set[str] = set()
+        self._version_counters: Dict[str, int] = {}
         self.filename_mappings: Dict[str, str] = {}
 
     def get_sanitized_filename(self, original_title: str, extension: str, 
@@ -281,14 +352,51 @@ class FilenameManager:
         """
         sanitized = get_unique_filename_advanced(
             original_title, extension, self.existing_files, 
-            max_base_len, self.use_spaces
+            max_base_len, self.use_spaces, self._version_counters
         )
+        self._register(original_title, extension, sanitized)
+        return sanitized
 
-        self.existing_files.add(sanitized.lower())
-        original_filename = original_title + extension
-        self.filename_mappings[original_filename] = sanitized
+    def bulk_sanitize(self, titles: List[tuple[str, str]],
+                      max_base_len: int = DEFAULT_MAX_BASENAME,
+                      max_workers: int = 1) -> List[str]:
+        """
+        Get sanitized, unique filenames for many titles at once.
+        Same result as calling get_sanitized_filename for each title in order.
+        
+        Args:
+            titles: List of (original_title, extension) pairs
+            max_base_len: Maximum length for the base filename (default: 150)
+            max_workers: If > 1, sanitize titles in that many worker processes;
+                uniqueness is always resolved here, in order. On Windows workers are
+                spawned, so the caller's entry script needs an
+                `if __name__ == "__main__":` guard
+        
+        Returns:
+            Sanitized, unique filenames, in the same order as titles
+        """
+        originals = [title for title, _ in titles]
+        extensions = [ext for _, ext in titles]
+        args = (originals, extensions, repeat(max_base_len), repeat(self.use_spaces))
+        if max_workers > 1 and len(titles) > 1:
+            # Imported here: multiprocessing is slow to import and only needed for this opt-in path
+            from concurrent.futures import ProcessPoolExecutor
+            chunksize = max(1, len(titles) // (max_workers * 4))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                filenames = list(executor.map(sanitize_title, *args, chunksize=chunksize))
+        else:
+            filenames = list(map(sanitize_title, *args))
 
-        return sanitized
+        results = []
+        for title, extension, filename in zip(originals, extensions, filenames):
+            sanitized = make_unique_filename(filename, title, self.existing_files, self._version_counters)
+            self._register(title, extension, sanitized)
+            results.append(sanitized)
+        return results
+
+    def _register(self, original_title: str, extension: str, sanitized: str) -> None:
+        self.existing_files.add(sanitized.lower())
+        self.filename_mappings[original_title + extension] = sanitized
 
     def get_mapping(self, original_filename: str) -> str:
         """Get the sanitized filename for a given original filename."""
@@ -8,10 +8,46 @@
 # Minimal additions to fix file:// protocol issues
 
 import base64
+import functools
 import mimetypes
 import os
 import re
-import urllib.parse
+
+# Read size for streamed base64 encoding; a multiple of 3 so no chunk is padded
+_B64_CHUNK_SIZE = 57 * 1024
+
+# Per-byte percent-encoding table, equivalent to urllib.parse.quote(..., safe='')
+_SAFE = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_.~'
+_QUOTE_TABLE = [chr(c) if c in _SAFE else f'%{c:02X}' for c in range(256)]
+
+_IMG_RE = re.compile(r'<img[^>]+src="([^"]+)"[^>]*>')
+
+# Load the MIME database now rather than on the first image of a run
+mimetypes.init()
+
+# Covers nearly all Evernote image resources without going through mimetypes
+_FAST_MIME = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.svg': 'image/svg+xml',
+}
+
+@functools.lru_cache(maxsize=1024)
+def _guess_mime_for_ext(ext: str):
+    """MIME type for a lowercase file extension (cached; mimetypes only looks at the extension)."""
+    if ext in _FAST_MIME:
+        return _FAST_MIME[ext]
+    return mimetypes.guess_type('x' + ext)[0]
+
+def _quote_component(part: str) -> str:
+    """Percent-encode a single path component using _QUOTE_TABLE."""
+    encoded = part.encode('utf-8')
+    if not encoded.rstrip(_SAFE):
+        return part
+    return ''.join(map(_QUOTE_TABLE.__getitem__, encoded))
 
 def make_web_safe_link_path(note_path: str, current_file_path: str = "") -> str:
     """Convert a note path to a web-safe relative link that works with file:// protocol."""
@@ -28,7 +64,10 @@ def make_web_safe_link_path(note_path: str, current_file_path: str = "") -> str:
     # Calculate relative path if we have current file context
     if current_file_path:
         try:
-            current_dir = os.path.dirname(current_file_path)
+            # Separators are already '/', so avoid os.path.dirname except for root/drive paths
+            current_dir = current_file_path.rpartition('/')[0]
+            if not current_dir or current_dir.endswith(':'):
+                current_dir = os.path.dirname(current_file_path)
             rel_path = os.path.relpath(note_path, current_dir)
             rel_path = rel_path.replace('\\', '/')
         except (ValueError, OSError):
@@ -38,7 +77,7 @@ def make_web_safe_link_path(note_path: str, current_file_path: str = "") -> str:
 
     # URL encode each path component to handle special characters
     parts = rel_path.split('/')
-    encoded_parts = [urllib.parse.quote(part, safe='') for part in parts if part]
+    encoded_parts = [_quote_component(part) for part in parts if part]
     web_path = '/'.join(encoded_parts)
 
     # Ensure proper relative path format for file:// protocol
@@ -54,25 +93,23 @@ def embed_resource_as_data_url(resource_path: str, mime_type: str, base_dir: str
     Args:
         resource_path: Path to resource file (used if binary_data is None)
         mime_type: MIME type of the resource
-        base_dir: Base directory (used if binary_data is None)
+        base_dir: Base directory (used if binary_data is None); if empty, resource_path is used as-is
         binary_data: Binary data to embed (if provided, ignores path)
     """
     try:
+        data_url = bytearray(f"data:{mime_type};base64,".encode('ascii'))
         if binary_data is not None:
             # Use provided binary data directly (for resources from database)
-            resource_data = binary_data
+            data_url += base64.b64encode(binary_data)
         else:
-            # Read from file path (original behavior)
-            full_path = os.path.join(base_dir, resource_path)
-            if not os.path.exists(full_path):
-                return None
+            # Read from file path, encoding chunk by chunk to avoid holding the raw file in memory.
+            # A missing file makes open() raise, which returns None below.
+            full_path = os.path.join(base_dir, resource_path) if base_dir else resource_path
             with open(full_path, 'rb') as f:
-                resource_data = f.read()
-
-        encoded_data = base64.b64encode(resource_data).decode('utf-8')
-        data_url = f"data:{mime_type};base64,{encoded_data}"
+                while chunk := f.read(_B64_CHUNK_SIZE):
+                    data_url += base64.b64encode(chunk)
 
-        return data_url
+        return data_url.decode('ascii')
 
     except Exception:
         return None
@@ -90,17 +127,17 @@ def bundle_html_resources(html_content: str, base_dir: str, bundle_enabled: bool
 
         try:
             full_path = os.path.join(base_dir, src_path)
-            if os.path.exists(full_path):
-                mime_type, _ = mimetypes.guess_type(full_path)
-                if mime_type and mime_type.startswith('image/'):
-                    data_url = embed_resource_as_data_url(src_path, mime_type, base_dir)
-                    if data_url:
-                        return match.group(0).replace(f'src="{src_path}"', f'src="{data_url}"')
+            mime_type = _guess_mime_for_ext(os.path.splitext(full_path)[1].lower())
+            if mime_type and mime_type.startswith('image/'):
+                # embed_resource_as_data_url returns None if the file can't be read
+                data_url = embed_resource_as_data_url(full_path, mime_type)
+                if data_url:
+                    return match.group(0).replace(f'src="{src_path}"', f'src="{data_url}"')
         except Exception:
             pass
 
         return match.group(0)
 
-    html_content = re.sub(r'<img[^>]+src="([^"]+)"[^>]*>', embed_image, html_content)
+    html_content = _IMG_RE.sub(embed_image, html_content)
 
     return html_content